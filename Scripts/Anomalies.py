@@ -0,0 +1,52 @@
+import numpy as np
+from scipy.optimize import fsolve
+
+### The anomaly conversions used by the Orbital Elements animation, pulled out into their own file so the J2 propagator can use the same math without kicking off the whole animation on import.
+
+# =============================================================================
+# ANOMALY CONVERSION FUNCTIONS
+# =============================================================================
+
+def mean_anomaly_from_true(true_anomaly, eccentricity):
+    """Convert true anomaly to mean anomaly - handles all quadrants properly"""
+    return (
+        np.arctan2(
+            -np.sqrt(1 - eccentricity**2) * np.sin(true_anomaly),
+            -eccentricity - np.cos(true_anomaly)
+        ) + np.pi
+        - eccentricity * np.sqrt(1 - eccentricity**2) * np.sin(true_anomaly)
+        / (1 + eccentricity * np.cos(true_anomaly))
+    )
+
+def eccentric_anomaly_from_mean(mean_anomaly, eccentricity):
+    """Solve Kepler's equation: M = E - e*sin(E) for E using numerical solver"""
+    func = lambda E: E - eccentricity*np.sin(E) - mean_anomaly
+    return fsolve(func, x0=mean_anomaly)
+
+def eccentric_anomaly_from_mean_newton(mean_anomaly, eccentricity, tolerance=1e-12, max_iterations=20):
+    """
+    Solve Kepler's equation: M = E - e*sin(E) for E with Newton's method
+    Same equation as above, but works on whole arrays at once (eccentricity broadcasts against mean_anomaly). Keeps the input dtype, so float32 in means float32 out.
+    fsolve treats an array as one big coupled system, which gets slow fast for thousands of satellites.
+    """
+    mean_anomaly = np.asarray(mean_anomaly)
+    eccentricity = np.asarray(eccentricity)
+
+    # Starting guess of E = M + e*sin(M) is plenty close for near-circular orbits
+    E = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    for _ in range(max_iterations):
+        step = (E - eccentricity*np.sin(E) - mean_anomaly) / (1 - eccentricity*np.cos(E))
+        E = E - step
+        if np.max(np.abs(step)) < tolerance:
+            break
+    return E
+
+def true_anomaly_from_eccentric(eccentric_anomaly, eccentricity):
+    """
+    Convert eccentric to true anomaly using beta formulation
+    From: https://ui.adsabs.harvard.edu/abs/1973CeMec...7..388B/abstract
+    This avoids numerical issues with the traditional tan(E/2) formula
+    """
+    beta = eccentricity / (1 + np.sqrt(1 - eccentricity**2))
+    return eccentric_anomaly + 2 * np.arctan2(beta * np.sin(eccentric_anomaly),
+                                            1 - beta * np.cos(eccentric_anomaly))
@@ -6,12 +6,17 @@ from rasterio.warp import reproject, Resampling
 from rasterio.transform import Affine
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from Region_Of_Interest import subset_grace, read_etopo_window, polygon_mask
 
 ### This is the script that works with the ETOPO 2022 topography data, specifically the geoid height dataset. If I'm not wrong, a static geoid height map wcan act as an equilibrium gravitational potential, which makes sense with the gravity simulations I can do with the GRACE dataset.
 
 # Okay...so this is a massive array to plot here. Good thing I have a powerful system, this might have fried my laptop. Gotta drop down the memory usage here. Tis using up nearly 4 gigs of RAM for just plotting this array.
 
-GRACE = xr.open_dataset('Path to Grace')
+# Region of interest. None reads the whole globe. Otherwise set region to (west, south, east, north) in degrees, or region_polygon to a list of (lon, lat) vertices, and only that part of GRACE and ETOPO gets read (see Region_Of_Interest.py)
+region = None
+region_polygon = None
+
+GRACE = subset_grace(xr.open_dataset('Path to Grace'), bounds = region, polygon = region_polygon)
 
 # GRACE spatial info
 lat = GRACE.lat.values
@@ -34,10 +39,16 @@ GRACE_transform = Affine(
 Topography_downsampled = np.empty((nlatitude, nlongitude), dtype = np.float32)
 
 with rasterio.open("path to Geoid dataset") as src:
+    # Only read the window around the region, no point reprojecting the whole planet for one basin
+    if region is None and region_polygon is None:
+        source, source_transform = rasterio.band(src, 1), src.transform
+    else:
+        source, source_transform = read_etopo_window(src, GRACE_transform, (nlatitude, nlongitude))
+
     reproject(
-        source = rasterio.band(src, 1),
+        source = source,
         destination = Topography_downsampled,
-        src_transform = src.transform,
+        src_transform = source_transform,
         src_crs = src.crs,
         dst_transform = GRACE_transform,
         dst_crs = "EPSG:4326",
@@ -45,10 +56,22 @@ with rasterio.open("path to Geoid dataset") as src:
         resampling = Resampling.bilinear
     )
 
+# Blank out everything outside the polygon, using the same grid the affine lays down
+if region_polygon is not None:
+    outside = ~polygon_mask(
+        GRACE_transform.c + GRACE_transform.a * np.arange(nlongitude),
+        GRACE_transform.f + GRACE_transform.e * np.arange(nlatitude),
+        region_polygon,
+    )
+    Topography_downsampled[outside] = np.nan
+
 # Now just gotta plot this
 plt.figure(figsize = (12, 6))
 ax = plt.axes(projection = ccrs.PlateCarree())
-ax.set_global()
+if region is None and region_polygon is None:
+    ax.set_global()
+else:
+    ax.set_extent([longitude_min, longitude_max, latitude_min, latitude_max], crs = ccrs.PlateCarree())
 ax.coastlines(resolution = '110m')
 ax.add_feature(cfeature.BORDERS, linewidth = 0.5)
 ax.add_feature(cfeature.LAND, facecolor = 'lightgray')
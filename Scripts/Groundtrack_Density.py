@@ -0,0 +1,94 @@
+import numpy as np
+
+from J2_Propagator import catalog_subpoints
+
+### Ground track density for big constellations. Drawing every track as a line (with cartopy working out the geodetic curve for each one) falls over past a few dozen satellites, and the plot is a hairball by then anyway.
+### Instead, every subpoint gets dropped into a global lat/lon grid and counted with np.bincount. The result is one image, so drawing it costs the same no matter how many satellites went in.
+### Satellites and times are worked through in chunks so memory stays flat for big catalogs and long time spans.
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _chunk_subpoints(satellites, times, propagator):
+    """Latitudes and longitudes (degrees) for a chunk, both shaped (N satellites, N times)"""
+    if propagator == 'J2':
+        return catalog_subpoints(satellites, times)     # deep space ones still go through SGP4 in there
+
+    latitudes = []
+    longitudes = []
+    for sat in satellites:
+        sat_subpoints = sat.at(times).subpoint()
+        latitudes.append(sat_subpoints.latitude.degrees)
+        longitudes.append(sat_subpoints.longitude.degrees)
+    return np.array(latitudes), np.array(longitudes)
+
+def _densify(latitudes, longitudes, resolution):
+    """
+    Fill in points along each track segment so a fast satellite doesn't skip over pixels between time steps
+    Each segment's longitude change gets wrapped to [-180, 180) so a segment crossing the antimeridian runs the short way across it, and the filled in points get wrapped back afterwards. That splits the segment at the seam instead of smearing it across the whole map.
+    Tracks come back flattened end to end (satellite 0's points, then satellite 1's, ...) along with the index where each satellite's track starts
+    """
+    n_satellites, n_times = latitudes.shape
+
+    # Every point starts a segment to the next one. The last point gets a zero length segment so it still shows up once
+    delta_latitudes = np.zeros_like(latitudes)
+    delta_longitudes = np.zeros_like(longitudes)
+    delta_latitudes[:, :-1] = np.diff(latitudes, axis = 1)
+    delta_longitudes[:, :-1] = np.mod(np.diff(longitudes, axis = 1) + 180.0, 360.0) - 180.0     # segments start from the wrapped longitudes, so chunking can't change the rounding
+
+    # Plate carree pixels are resolution degrees wide in longitude at every latitude, so the step is measured in plain degrees on both axes.
+    # Half a pixel per substep is enough to not leave gaps. Each segment gets its own count, so one polar segment whipping through lots of longitude doesn't inflate everyone else's
+    largest_step = np.maximum(np.abs(delta_latitudes), np.abs(delta_longitudes)).ravel()
+    steps = np.maximum(np.ceil(largest_step / (resolution / 2)).astype(np.int64), 1)
+
+    segment_starts = np.cumsum(steps) - steps
+    segment = np.repeat(np.arange(steps.size), steps)
+    fractions = ((np.arange(segment.size) - segment_starts[segment]) / steps[segment]).astype(latitudes.dtype)     # match the tracks' dtype so float32 tracks stay float32
+
+    dense_latitudes = latitudes.ravel()[segment] + delta_latitudes.ravel()[segment] * fractions
+    dense_longitudes = longitudes.ravel()[segment] + delta_longitudes.ravel()[segment] * fractions
+    track_starts = segment_starts[::n_times]
+    return dense_latitudes, np.mod(dense_longitudes + 180.0, 360.0) - 180.0, track_starts
+
+def _pixel_indices(latitudes, longitudes, resolution, n_rows, n_columns):
+    """Flat raster index for each point. Row 0 is the north pole so the raster can go straight into imshow with origin = 'upper'"""
+    rows = np.clip(np.floor((90.0 - latitudes) / resolution).astype(np.int64), 0, n_rows - 1)
+    columns = np.clip(np.floor((longitudes + 180.0) / resolution).astype(np.int64), 0, n_columns - 1)
+    return rows * n_columns + columns
+
+
+# =============================================================================
+# RASTERIZATION
+# =============================================================================
+
+def accumulate_density(satellites, times, resolution = 0.5, propagator = 'J2', satellite_chunk = 100, time_chunk = 360):
+    """
+    Count how many times satellites pass over each pixel of a global lat/lon grid
+    resolution is the pixel size in degrees. propagator is 'J2' (J2_Propagator.py) or 'SGP4' (skyfield)
+    Returns an (180/resolution, 360/resolution) integer raster covering [-180, 180] x [-90, 90], north up
+    """
+    n_rows = int(round(180 / resolution))
+    n_columns = int(round(360 / resolution))
+    counts = np.zeros(n_rows * n_columns, dtype = np.int64)
+
+    for s in range(0, len(satellites), satellite_chunk):
+        chunk_satellites = satellites[s:s + satellite_chunk]
+
+        for t in range(0, len(times), time_chunk):
+            # Grab one extra point from the previous chunk so the segment across the chunk boundary still gets filled in
+            first = max(t - 1, 0)
+            latitudes, longitudes = _chunk_subpoints(chunk_satellites, times[first:t + time_chunk], propagator)
+            latitudes, longitudes, track_starts = _densify(latitudes, longitudes, resolution)
+            pixels = _pixel_indices(latitudes, longitudes, resolution, n_rows, n_columns)
+
+            # A satellite lingering in one pixel for several points is still just one visit. Each satellite's first point always counts, whatever pixel the previous satellite ended in
+            keep = np.ones(pixels.shape, dtype = bool)
+            keep[1:] = pixels[1:] != pixels[:-1]
+            keep[track_starts] = True
+            if first < t:
+                keep[track_starts] = False     # already counted at the end of the last chunk
+
+            counts += np.bincount(pixels[keep], minlength = counts.size)
+
+    return counts.reshape(n_rows, n_columns)
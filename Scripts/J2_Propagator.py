@@ -0,0 +1,271 @@
+import numpy as np
+import glob
+import warnings
+from time import perf_counter
+from datetime import timedelta
+from skyfield.api import load, EarthSatellite
+from skyfield.framelib import itrs
+
+from Anomalies import eccentric_anomaly_from_mean_newton, true_anomaly_from_eccentric
+
+### A quick and dirty propagator for when SGP4 is overkill. Coverage maps and screening over big catalogs don't need SGP4's drag, deep space and long period terms, they need lots of points fast.
+### So here the TLE mean elements get treated as a plain Keplerian ellipse, and the only perturbation kept is J2: the secular drift (Earth's equatorial bulge slowly swinging the node, perigee, and mean anomaly around), plus the short period J2 and long period J3 terms SGP4 itself uses to turn the mean elements into osculating ones.
+### Everything is done on (satellites, times) arrays at once, so there's no python loop over the catalog.
+### This is a near-Earth model only. Deep space objects (period of 225 minutes or more, which SGP4 runs through SDP4) are tens of km off in it, so catalog_subpoints() hands those to skyfield instead.
+
+# WGS-72 constants, since that's what the TLEs (and SGP4) are built on
+MU = 398600.8               # km^3/s^2
+EARTH_RADIUS = 6378.135     # km
+J2 = 0.001082616
+J3 = -0.00000253881
+
+# WGS-84 ellipsoid for the geodetic latitude of the subpoints
+WGS84_RADIUS = 6378.137    # km
+FLATTENING = 1 / 298.257223563
+
+
+# =============================================================================
+# ELEMENTS
+# =============================================================================
+
+def is_deep_space(satellites):
+    """True for each satellite SGP4 runs in deep space (SDP4) mode, i.e. a period of 225 minutes or more"""
+    return np.array([sat.model.method == 'd' for sat in satellites], dtype = bool)
+
+def elements_from_satellites(satellites, warn_deep_space = True):
+    """
+    Pull the mean elements out of each EarthSatellite's sgp4 model into (N,) arrays
+    Angles are in radians, mean motion in rad/min, epoch as a UTC julian date split into whole and fraction (like sgp4 keeps it)
+    Warns if any deep space satellites slipped in, since the J2 mode doesn't model them (use catalog_subpoints for mixed catalogs)
+    """
+    if warn_deep_space:
+        n_deep = int(is_deep_space(satellites).sum())
+        if n_deep:
+            warnings.warn(f'{n_deep} deep space satellite(s) are going through the near-Earth J2 model and will be tens of km off. Use catalog_subpoints() to send them through SGP4.')
+
+    models = [sat.model for sat in satellites]
+
+    # The model's a (in Earth radii) is the semi-major axis SGP4 gets after un-Kozai-ing the TLE mean motion, so use that rather than the raw TLE value
+    semimajor = np.array([m.a for m in models]) * EARTH_RADIUS
+    eccentricity = np.array([m.ecco for m in models])
+
+    return {
+        'semimajor': semimajor,
+        'mean_motion': np.sqrt(MU / semimajor**3) * 60.0,     # rad/s -> rad/min
+        'eccentricity': eccentricity,
+        'inclination': np.array([m.inclo for m in models]),
+        'raan': np.array([m.nodeo for m in models]),
+        'argp': np.array([m.argpo for m in models]),
+        'mean_anomaly': np.array([m.mo for m in models]),
+        'epoch_whole': np.array([m.jdsatepoch for m in models]),
+        'epoch_fraction': np.array([m.jdsatepochF for m in models]),
+    }
+
+def j2_rates(elements):
+    """Secular J2 drift rates (rad/min) for the node, argument of perigee and mean anomaly"""
+    a = elements['semimajor']
+    e = elements['eccentricity']
+    n = elements['mean_motion']
+    cos_i = np.cos(elements['inclination'])
+    sin2_i = 1 - cos_i**2
+
+    semilatus = a * (1 - e**2)
+    factor = 1.5 * J2 * (EARTH_RADIUS / semilatus)**2 * n
+
+    raan_rate = -factor * cos_i
+    argp_rate = factor * (2 - 2.5 * sin2_i)
+    mean_anomaly_rate = n + factor * np.sqrt(1 - e**2) * (1 - 1.5 * sin2_i)
+    return raan_rate, argp_rate, mean_anomaly_rate
+
+
+# =============================================================================
+# PROPAGATION
+# =============================================================================
+
+def positions_teme(elements, times):
+    """
+    Propagate every satellite to every time. Returns a (3, N satellites, N times) array in km, TEME frame (same as raw SGP4 output)
+    times is a skyfield Time array
+    """
+    # Minutes since each satellite's own epoch, shape (N, T). TLE epochs are UTC, so the elapsed time has to be UTC too, built the same way skyfield builds it for sgp4.
+    # UT1 drifts up to a second off UTC, which is ~7.5 km along track at LEO. UT1 only belongs in the GMST rotation
+    utc_whole = np.atleast_1d(times.whole)
+    utc_fraction = np.atleast_1d(times.tai_fraction - times._leap_seconds() / 86400.0)
+    minutes = ((utc_whole[np.newaxis, :] - elements['epoch_whole'][:, np.newaxis])
+               + (utc_fraction[np.newaxis, :] - elements['epoch_fraction'][:, np.newaxis])) * 1440.0
+
+    raan_rate, argp_rate, mean_anomaly_rate = j2_rates(elements)
+
+    # The angles pile up thousands of radians over a long span, so they get built and wrapped in float64 first.
+    # Everything after that runs in float32: numpy's float32 trig is several times faster, and it's still good to about a meter at LEO radii
+    raan = np.mod(elements['raan'][:, np.newaxis] + raan_rate[:, np.newaxis] * minutes, 2*np.pi).astype(np.float32)
+    argp = np.mod(elements['argp'][:, np.newaxis] + argp_rate[:, np.newaxis] * minutes, 2*np.pi).astype(np.float32)
+    M = np.mod(elements['mean_anomaly'][:, np.newaxis] + mean_anomaly_rate[:, np.newaxis] * minutes, 2*np.pi).astype(np.float32)
+
+    e = elements['eccentricity'][:, np.newaxis].astype(np.float32)
+    a = elements['semimajor'][:, np.newaxis].astype(np.float32)
+    inclination = elements['inclination'][:, np.newaxis].astype(np.float32)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+
+    # Long period J3 terms, also straight out of SGP4. They nudge the eccentricity vector by ~0.001, which is several km for a near circular LEO, so the ellipse gets rebuilt from the nudged vector
+    scale = EARTH_RADIUS / (a * (1 - e**2))
+    axn = e * np.cos(argp)
+    ayn = e * np.sin(argp) - 0.5 * (J3 / J2) * sin_i * scale
+    mean_longitude = M + argp - 0.25 * (J3 / J2) * sin_i * (3 + 5 * cos_i) / (1 + cos_i) * scale * axn
+    e = np.hypot(axn, ayn)
+    argp = np.arctan2(ayn, axn)
+    M = np.mod(mean_longitude - argp, 2*np.pi)
+
+    # mean -> eccentric -> true, same route as the Orbital Elements animation
+    E = eccentric_anomaly_from_mean_newton(M, e, tolerance=1e-6)     # about as tight as float32 goes
+    nu = true_anomaly_from_eccentric(E, e)
+
+    # Radius and argument of latitude on the mean ellipse
+    r = a * (1 - e * np.cos(E))
+    u = argp + nu
+
+    # Mean -> osculating. These are the first order short period J2 wiggles, the same ones SGP4 adds at the very end
+    semilatus = a * (1 - e**2)
+    k = 0.5 * J2 * (EARTH_RADIUS / semilatus)**2
+    sin_2u, cos_2u = np.sin(2*u), np.cos(2*u)
+
+    r = r * (1 - 1.5 * k * np.sqrt(1 - e**2) * (3 * cos_i**2 - 1)) + 0.5 * k * semilatus * sin_i**2 * cos_2u
+    u = u - 0.25 * k * (7 * cos_i**2 - 1) * sin_2u
+    raan = raan + 1.5 * k * cos_i * sin_2u
+    inclination = inclination + 1.5 * k * cos_i * sin_i * cos_2u
+
+    # Now rotate out of the orbital plane
+    cos_raan, sin_raan = np.cos(raan), np.sin(raan)
+    cos_u, sin_u = np.cos(u), np.sin(u)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+
+    x = r * (cos_raan * cos_u - sin_raan * sin_u * cos_i)
+    y = r * (sin_raan * cos_u + cos_raan * sin_u * cos_i)
+    z = r * (sin_u * sin_i)
+    return np.array([x, y, z])
+
+def positions_earth_fixed(elements, times):
+    """
+    Same as positions_teme, but spun into the Earth-fixed frame with GMST (polar motion is ignored, it's meters)
+    Returns (3, N satellites, N times) in km
+    """
+    x, y, z = positions_teme(elements, times)
+    theta = np.radians(np.atleast_1d(times.gmst) * 15.0)     # gmst is in hours
+    cos_t, sin_t = np.cos(theta).astype(np.float32), np.sin(theta).astype(np.float32)
+    return np.array([cos_t * x + sin_t * y, -sin_t * x + cos_t * y, z])
+
+def _latitudes_longitudes(x, y, z):
+    """Geodetic latitude and longitude (degrees) from Earth-fixed x, y, z in km"""
+    longitudes = np.mod(np.degrees(np.arctan2(y, x)) + 180.0, 360.0) - 180.0
+
+    # Geocentric -> geodetic latitude. One Bowring style step from the surface-point guess gets well under a kilometer at orbital altitudes
+    e2 = FLATTENING * (2 - FLATTENING)
+    p = np.hypot(x, y)
+    latitudes = np.arctan2(z, p * (1 - e2))
+    N = WGS84_RADIUS / np.sqrt(1 - e2 * np.sin(latitudes)**2)
+    height = p / np.cos(latitudes) - N
+    latitudes = np.arctan2(z, p * (1 - e2 * N / (N + height)))
+    return np.degrees(latitudes), longitudes
+
+def subpoints(elements, times):
+    """
+    Latitude and longitude (degrees) under each satellite, both shaped (N satellites, N times)
+    Longitudes are wrapped to [-180, 180) just like skyfield's subpoint()
+    """
+    return _latitudes_longitudes(*positions_earth_fixed(elements, times))
+
+def catalog_subpoints(satellites, times):
+    """
+    Subpoints for a whole catalog, both shaped (N satellites, N times) in degrees
+    Near-Earth satellites go through the J2 mode in one go, deep space ones go through skyfield's SGP4/SDP4 one at a time
+    """
+    deep = is_deep_space(satellites)
+    n_times = len(np.atleast_1d(times.tt))
+    latitudes = np.empty((len(satellites), n_times), dtype = np.float32)
+    longitudes = np.empty((len(satellites), n_times), dtype = np.float32)
+
+    near_earth = np.nonzero(~deep)[0]
+    if len(near_earth):
+        latitudes[near_earth], longitudes[near_earth] = subpoints(elements_from_satellites([satellites[i] for i in near_earth]), times)
+
+    for i in np.nonzero(deep)[0]:
+        sat_subpoints = satellites[i].at(times).subpoint()
+        latitudes[i] = sat_subpoints.latitude.degrees
+        longitudes[i] = sat_subpoints.longitude.degrees
+
+    return latitudes, longitudes
+
+
+# =============================================================================
+# ERROR AND TIMING AGAINST SGP4
+# =============================================================================
+
+def compare_to_sgp4(satellites, times):
+    """
+    Run the catalog through both the J2 mode and skyfield's full SGP4, and report how far apart they are and how long each took
+    Both sides are timed all the way to subpoints, since that's what the coverage and ground track work actually needs
+    Position error is taken in the Earth-fixed frame so both sides are compared in the same place
+    Every satellite goes through the J2 model here, even deep space ones, so the error gets reported separately for near-Earth and deep space objects
+    """
+    start = perf_counter()
+    elements = elements_from_satellites(satellites, warn_deep_space = False)
+    j2_xyz = positions_earth_fixed(elements, times)
+    _latitudes_longitudes(*j2_xyz)
+    j2_seconds = perf_counter() - start
+
+    start = perf_counter()
+    sgp4_xyz = []
+    for sat in satellites:
+        geocentric = sat.at(times)
+        sgp4_xyz.append(geocentric.frame_xyz(itrs).km)
+        geocentric.subpoint()
+    sgp4_seconds = perf_counter() - start
+
+    errors = np.linalg.norm(j2_xyz.transpose(1, 0, 2) - np.array(sgp4_xyz), axis = 1)   # (N, T) in km
+    deep = is_deep_space(satellites)
+
+    report = {
+        'errors_km': errors,
+        'deep_space': deep,
+        'j2_seconds': j2_seconds,
+        'sgp4_seconds': sgp4_seconds,
+        'speedup': sgp4_seconds / j2_seconds,
+    }
+    for group, members in (('near_earth', ~deep), ('deep_space', deep)):
+        report[f'{group}_count'] = int(members.sum())
+        report[f'{group}_median_error_km'] = float(np.median(errors[members])) if members.any() else np.nan
+        report[f'{group}_max_error_km'] = float(np.max(errors[members])) if members.any() else np.nan
+    return report
+
+
+if __name__ == '__main__':
+    ts = load.timescale()
+
+    # Same TLE folder setup as TLE Handler
+    tle_files = glob.glob('Location of the folder containing TLE .txt files')
+    satellites = []
+    for tle_path in tle_files:
+        with open(tle_path, 'r', encoding = 'utf-8') as f:
+            lines = f.read().splitlines()
+            if len(lines) >= 3:
+                satellites.append(EarthSatellite(lines[1].strip(), lines[2].strip(), lines[0].strip(), ts))
+
+    print(f'Loaded {len(satellites)} satellites.')
+
+    # A day at one minute steps
+    present_time = ts.now()
+    times = ts.utc([present_time.utc_datetime() + timedelta(minutes=i) for i in range(1440)])
+
+    report = compare_to_sgp4(satellites, times)
+    print(f"J2 mode:  {report['j2_seconds']:.3f} s")
+    print(f"SGP4:     {report['sgp4_seconds']:.3f} s  ({report['speedup']:.0f}x slower)")
+    for group, label in (('near_earth', 'Near-Earth'), ('deep_space', 'Deep space (catalog_subpoints sends these to SGP4)')):
+        if report[f'{group}_count']:
+            print(f"{label}, {report[f'{group}_count']} satellites: median {report[f'{group}_median_error_km']:.1f} km, max {report[f'{group}_max_error_km']:.1f} km")
+
+    # Error grows along track with time, so show how it drifts over the day for the near-Earth ones
+    near_earth_errors = report['errors_km'][~report['deep_space']]
+    if len(near_earth_errors):
+        for hour in range(0, 25, 6):
+            column = min(hour * 60, len(times) - 1)
+            print(f"  +{hour:2d} h: median {np.median(near_earth_errors[:, column]):.1f} km")
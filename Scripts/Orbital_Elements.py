@@ -2,38 +2,18 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.patches as mpatches
-from scipy.optimize import fsolve
+from Anomalies import (
+    mean_anomaly_from_true,
+    eccentric_anomaly_from_mean,
+    true_anomaly_from_eccentric,
+)
 
 
 # =============================================================================
 # ANOMALY CONVERSION FUNCTIONS
 # =============================================================================
 
-def mean_anomaly_from_true(true_anomaly, eccentricity):
-    """Convert true anomaly to mean anomaly - handles all quadrants properly"""
-    return (
-        np.arctan2(
-            -np.sqrt(1 - eccentricity**2) * np.sin(true_anomaly), 
-            -eccentricity - np.cos(true_anomaly)
-        ) + np.pi 
-        - eccentricity * np.sqrt(1 - eccentricity**2) * np.sin(true_anomaly) 
-        / (1 + eccentricity * np.cos(true_anomaly))
-    )
-
-def eccentric_anomaly_from_mean(mean_anomaly, eccentricity):
-    """Solve Kepler's equation: M = E - e*sin(E) for E using numerical solver"""
-    func = lambda E: E - eccentricity*np.sin(E) - mean_anomaly
-    return fsolve(func, x0=mean_anomaly)
-
-def true_anomaly_from_eccentric(eccentric_anomaly, eccentricity):
-    """
-    Convert eccentric to true anomaly using beta formulation
-    From: https://ui.adsabs.harvard.edu/abs/1973CeMec...7..388B/abstract
-    This avoids numerical issues with the traditional tan(E/2) formula
-    """
-    beta = eccentricity / (1 + np.sqrt(1 - eccentricity**2))
-    return eccentric_anomaly + 2 * np.arctan2(beta * np.sin(eccentric_anomaly), 
-                                            1 - beta * np.cos(eccentric_anomaly))
+# mean_anomaly_from_true, eccentric_anomaly_from_mean and true_anomaly_from_eccentric live in Anomalies.py now
 
 # def color_arc(ax, center, initial_angle, final_angle, color, arc_radius=0.3, alpha=0.6):
 #    """Draw a colored arc to visualize angle measurements"""
@@ -0,0 +1,175 @@
+import numpy as np
+import xarray as xr
+from matplotlib.path import Path
+from rasterio.windows import Window, from_bounds
+from rasterio.transform import Affine
+
+### Region of interest helpers. Looking at one basin or one ice sheet shouldn't mean reading (and reprojecting) the whole planet first.
+### A region is either a bounding box, (west, south, east, north) in degrees, or a polygon, a list of (lon, lat) vertices. A polygon gets read through its bounding box and then masked.
+### The box gets pushed down into the readers: GRACE is sliced by index before any data comes off disk, and ETOPO only reads the rasterio window(s) the cropped GRACE grid touches.
+### Longitudes can be given as -180..180 or 0..360. A box that crosses a seam (0/360 for GRACE, -180/180 for ETOPO) is handled by reading both sides and stitching them into one continuous longitude range, e.g. -10..30 or 170..190.
+
+# =============================================================================
+# BOUNDS
+# =============================================================================
+
+def _unwrap_polygon(polygon):
+    """
+    Copy of the polygon with its longitudes unwrapped, so a polygon across a seam (350 -> 30, or 170 -> -170) runs continuously (350 -> 390, 170 -> 190)
+    Without this the ±360 jump between vertices turns a small polygon into one that wraps most of the way around the globe
+    Polygons that already span the full 360 degrees (a polar cap like an ice sheet, drawn with its own -180 and 180 sides) are left alone, since unwrapping would collapse those sides.
+    A ring that winds all the way around a pole (its closing edge lands 360 degrees from where it started) gets closed over that pole.
+    """
+    polygon = np.array(polygon, dtype = float)
+    longitudes = polygon[:, 0]
+    if longitudes.max() - longitudes.min() >= 360.0:
+        return polygon
+
+    # Unwrap the closing edge (last vertex back to the first) along with the rest
+    ring = np.degrees(np.unwrap(np.radians(np.append(longitudes, longitudes[0]))))
+    polygon[:, 0] = ring[:-1]
+
+    if abs(ring[-1] - ring[0]) > 180.0:
+        pole = -90.0 if polygon[:, 1].mean() < 0 else 90.0
+        polygon = np.vstack([polygon, [[ring[-1], polygon[0, 1]], [ring[-1], pole], [ring[0], pole]]])
+    return polygon
+
+def region_bounds(bounds = None, polygon = None):
+    """
+    Turn a bounding box or polygon into (west, south, east, north) with east > west
+    west is in [-180, 180), east can run past 180 when the box crosses the antimeridian (170..190 instead of 170..-170)
+    """
+    if polygon is not None:
+        polygon = _unwrap_polygon(polygon)
+        bounds = (polygon[:, 0].min(), polygon[:, 1].min(), polygon[:, 0].max(), polygon[:, 1].max())
+
+    lon_min, south, lon_max, north = bounds
+    west = np.mod(lon_min + 180.0, 360.0) - 180.0
+    width = np.mod(lon_max - lon_min, 360.0)
+    if width == 0 and lon_max != lon_min:
+        width = 360.0       # all the way around
+    return float(west), float(south), float(west + width), float(north)
+
+def polygon_mask(longitudes, latitudes, polygon):
+    """
+    Boolean (N latitudes, N longitudes) mask of the grid points inside the polygon
+    The polygon gets unwrapped, and the grid's longitudes get moved into the polygon's own 360 degree frame, so 0..360, -180..180, seam crossing and polar cap polygons all work
+    """
+    polygon = _unwrap_polygon(polygon)
+    polygon_west = polygon[:, 0].min()
+    longitudes = polygon_west + np.mod(np.asarray(longitudes) - polygon_west, 360.0)
+
+    Longitude, Latitude = np.meshgrid(longitudes, latitudes)
+    inside = Path(polygon).contains_points(np.column_stack([Longitude.ravel(), Latitude.ravel()]))
+    return inside.reshape(Longitude.shape)
+
+
+# =============================================================================
+# GRACE
+# =============================================================================
+
+def _runs(indices):
+    """Split a list of indices into runs of consecutive ones, so each run can be one slice"""
+    breaks = np.nonzero(np.diff(indices) != 1)[0] + 1
+    return np.split(indices, breaks)
+
+def subset_grace(dataset, bounds = None, polygon = None):
+    """
+    Cut a lazily opened GRACE dataset down to a region before anything gets read
+    Everything here is isel with slices, so the netCDF reads that happen later only cover the region
+    Longitudes come back continuous and increasing (e.g. -10..30 for a box across Greenwich), lon_bounds included. With no region the dataset comes back untouched
+    """
+    if bounds is None and polygon is None:
+        return dataset
+
+    west, south, east, north = region_bounds(bounds, polygon)
+    latitude = dataset.lat.values
+    longitude = dataset.lon.values
+
+    lat_indices = np.nonzero((latitude >= south) & (latitude <= north))[0]
+
+    # Put every GRACE longitude into the box's frame [west, west + 360), then the box is just <= east
+    shifted = west + np.mod(longitude - west, 360.0)
+    lon_indices = np.nonzero(shifted <= east)[0]
+    lon_indices = lon_indices[np.argsort(shifted[lon_indices], kind = 'stable')]
+
+    if len(lat_indices) == 0 or len(lon_indices) == 0:
+        raise ValueError(f'Region {bounds if polygon is None else "polygon"} does not cover any GRACE grid points')
+
+    dataset = dataset.isel(lat = slice(lat_indices[0], lat_indices[-1] + 1))
+
+    # One slice normally, two when the box crosses the 0/360 seam. Each piece is still lazy until the concat
+    pieces = [dataset.isel(lon = slice(run[0], run[-1] + 1)) for run in _runs(lon_indices)]
+    dataset = pieces[0] if len(pieces) == 1 else xr.concat(pieces, dim = 'lon', data_vars = 'minimal', coords = 'minimal', compat = 'override')
+    dataset = dataset.assign_coords(lon = shifted[lon_indices])
+
+    # Anything else holding longitudes along lon (lon_bounds, or whatever the lon's bounds attribute points at) gets the same per-column shift, so it still lines up with lon
+    offset = xr.DataArray(shifted[lon_indices] - longitude[lon_indices], dims = 'lon')
+    bounds_name = dataset.lon.attrs.get('bounds')
+    for name in list(dataset.variables):
+        if name != 'lon' and 'lon' in dataset[name].dims and (name == bounds_name or name.startswith('lon')):
+            variable = dataset[name]
+            dataset[name] = (variable + offset).transpose(*variable.dims).assign_attrs(variable.attrs)
+
+    if polygon is not None:
+        mask = xr.DataArray(polygon_mask(dataset.lon.values, dataset.lat.values, polygon), dims = ('lat', 'lon'))
+        for name, variable in dataset.data_vars.items():
+            if 'lat' in variable.dims and 'lon' in variable.dims:
+                dataset[name] = variable.where(mask)
+
+    return dataset
+
+
+# =============================================================================
+# ETOPO
+# =============================================================================
+
+def read_etopo_window(src, dst_transform, dst_shape):
+    """
+    Read only the part of an open ETOPO raster that the target grid (dst_transform over dst_shape = (rows, columns)) needs
+    Returns (data, transform) ready to hand to reproject as the source
+    The window follows the target grid rather than the raw region box: the grid's outer cells run past the box, and bilinear resampling while downsampling widens its kernel by the dst/src resolution ratio, so a margin of that many source pixels goes around the grid's extent.
+    A grid crossing the antimeridian reads the window on each side and stitches them, with the transform in the grid's continuous longitudes (170..190 and so on)
+    """
+    n_rows, n_columns = dst_shape
+    west = dst_transform.c
+    east = dst_transform.c + dst_transform.a * n_columns
+    north = dst_transform.f
+    south = dst_transform.f + dst_transform.e * n_rows
+    west, east = min(west, east), max(west, east)
+    south, north = min(south, north), max(south, north)
+
+    # Enough source pixels around the grid to cover the widened bilinear kernel at the outer cells, plus a couple for rounding
+    src_resolution = max(abs(src.transform.a), abs(src.transform.e))
+    dst_resolution = max(abs(dst_transform.a), abs(dst_transform.e))
+    margin = (np.ceil(dst_resolution / src_resolution) + 2) * src_resolution
+    west, east, south, north = west - margin, east + margin, south - margin, north + margin
+
+    left_edge = src.bounds.left
+    right_edge = src.bounds.right
+    pieces = []
+    transform = None
+    for shift in (-360.0, 0.0, 360.0):
+        piece_west = max(west, left_edge + shift) - shift
+        piece_east = min(east, right_edge + shift) - shift
+        if piece_east <= piece_west:
+            continue
+
+        window = from_bounds(piece_west, south, piece_east, north, transform = src.transform)
+        col_start = min(max(int(np.floor(window.col_off + 1e-9)), 0), src.width)
+        row_start = min(max(int(np.floor(window.row_off + 1e-9)), 0), src.height)
+        col_stop = min(max(int(np.ceil(window.col_off + window.width - 1e-9)), 0), src.width)
+        row_stop = min(max(int(np.ceil(window.row_off + window.height - 1e-9)), 0), src.height)
+        if col_stop <= col_start or row_stop <= row_start:
+            continue
+        window = Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+        pieces.append(src.read(1, window = window))
+        if transform is None:
+            transform = Affine.translation(shift, 0) * src.window_transform(window)
+
+    if not pieces:
+        raise ValueError('The target grid does not overlap the ETOPO raster')
+
+    # Each piece picks up at the raster's west edge, right where the one before it left off at the east edge
+    return np.hstack(pieces), transform
@@ -5,6 +5,8 @@ import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 import glob
 from datetime import timedelta
+from J2_Propagator import catalog_subpoints
+from Groundtrack_Density import accumulate_density
 
 # Skyfield wants a timescale. Needs leap seconds to turn the lte epoch date to a .epoch Time object.
 ts = load.timescale()
@@ -42,40 +44,62 @@ present_time = ts.now()
 # times = ts.utc(present_time.utc_datetime() + np.array([np.timedelta64(m, 'm') for m in minutes]))
 times = ts.utc([present_time.utc_datetime() + timedelta(minutes=i) for i in range(95)])    # Skyfield's built-in time-step function
 
-for i, sat in enumerate(satellites):
-    geocentric_positions = sat.at(times)
-    positions_km = geocentric_positions.position.km # takes the shape (3, N)
-    print(f"{sat.name}: {positions_km.shape[1]} ! Oi! U er' that? U got yer stinkin computations! ")
-
-    # Plottin!
-    subpoints = geocentric_positions.subpoint()
-    latitudes = subpoints.latitude.degrees
-    longitudes = subpoints.longitude.degrees
-
-    ### For this next little part here, I want little arrow tickmarks on the satellite tracks to show their direction of travel.
-    # position change from point to point
-    delta_longitudes = np.diff(longitudes)
-    delta_latitudes = np.diff(latitudes)
-
-    # arrow positions (using midpoint formula)
-    midpoint_longitudes = (longitudes[:-1] + longitudes[1:]) / 2
-    midpoint_latitudes = (latitudes[:-1] + latitudes[1:]) / 2
-
-    # To acquire consistant arrow size, we'll need some normalization
-    The_norm = np.sqrt(delta_longitudes**2 + delta_latitudes**2)
-    u = delta_longitudes / The_norm
-    v = delta_latitudes / The_norm
-
-    # The plot. Nothing wrong is happenin here
-    ax.plot(longitudes, latitudes, transform = ccrs.Geodetic(), color = colors[i], linewidth = 1.5, label = sat.name)
-
-    # Now we need a quiver
-    # Just plot them every...I don't know...nth point
-    step = 10
-    ax.quiver(midpoint_longitudes[::step], midpoint_latitudes[::step], u[::step], v[::step], transform = ccrs.PlateCarree(), color = 'red', scale = 20, width = 0.003, headwidth = 3, headlength = 4)
-
-plot.title('Simulated Groundtracks of GRACE-FO 1 and ICEsat-2 satellites over 95 minutes')
-plot.legend()
+# Which propagator? 'SGP4' is skyfield's full model, 'J2' is the fast two-body + J2 drift one from J2_Propagator.py (good enough for coverage, way faster for big catalogs)
+propagator = 'SGP4'
+
+# How to draw them? 'tracks' draws every track with direction arrows, fine for a handful of satellites. 'density' counts passes per pixel into one raster (Groundtrack_Density.py), use that for big constellations
+render = 'tracks'
+
+if render == 'density':
+    density = accumulate_density(satellites, times, resolution = 0.5, propagator = propagator)
+
+    # One image for the whole constellation. Empty pixels are masked so the coastlines still show through
+    image = ax.imshow(np.ma.masked_equal(density, 0), origin = 'upper', extent = [-180, 180, -90, 90], transform = ccrs.PlateCarree(), cmap = 'viridis', interpolation = 'nearest')
+    cbar = plot.colorbar(image, ax = ax, orientation = 'vertical', pad = 0.02, shrink = 0.8)
+    cbar.set_label('Passes per pixel')
+    plot.title(f'Groundtrack density of {len(satellites)} satellites over {len(times)} minutes')
+else:
+    if propagator == 'J2':
+        all_latitudes, all_longitudes = catalog_subpoints(satellites, times)     # (N satellites, N times) in one go, deep space ones still get SGP4
+
+    for i, sat in enumerate(satellites):
+        if propagator == 'J2':
+            latitudes = all_latitudes[i]
+            longitudes = all_longitudes[i]
+        else:
+            geocentric_positions = sat.at(times)
+            positions_km = geocentric_positions.position.km # takes the shape (3, N)
+            print(f"{sat.name}: {positions_km.shape[1]} ! Oi! U er' that? U got yer stinkin computations! ")
+
+            # Plottin!
+            sat_subpoints = geocentric_positions.subpoint()
+            latitudes = sat_subpoints.latitude.degrees
+            longitudes = sat_subpoints.longitude.degrees
+
+        ### For this next little part here, I want little arrow tickmarks on the satellite tracks to show their direction of travel.
+        # position change from point to point
+        delta_longitudes = np.diff(longitudes)
+        delta_latitudes = np.diff(latitudes)
+
+        # arrow positions (using midpoint formula)
+        midpoint_longitudes = (longitudes[:-1] + longitudes[1:]) / 2
+        midpoint_latitudes = (latitudes[:-1] + latitudes[1:]) / 2
+
+        # To acquire consistant arrow size, we'll need some normalization
+        The_norm = np.sqrt(delta_longitudes**2 + delta_latitudes**2)
+        u = delta_longitudes / The_norm
+        v = delta_latitudes / The_norm
+
+        # The plot. Nothing wrong is happenin here
+        ax.plot(longitudes, latitudes, transform = ccrs.Geodetic(), color = colors[i], linewidth = 1.5, label = sat.name)
+
+        # Now we need a quiver
+        # Just plot them every...I don't know...nth point
+        step = 10
+        ax.quiver(midpoint_longitudes[::step], midpoint_latitudes[::step], u[::step], v[::step], transform = ccrs.PlateCarree(), color = 'red', scale = 20, width = 0.003, headwidth = 3, headlength = 4)
+
+    plot.title('Simulated Groundtracks of GRACE-FO 1 and ICEsat-2 satellites over 95 minutes')
+    plot.legend()
 plot.show()
 
 # fig.savefig('Assets/Satellite Groundtracks.png', format = 'png')
\ No newline at end of file
@@ -6,10 +6,15 @@ import numpy as np
 import cartopy.crs as ccrs 
 import cartopy.feature as cfeature
 import xarray as xr
+from Region_Of_Interest import subset_grace, read_etopo_window, polygon_mask
 
 ### This script is primarily for just visualizing what the affine transforms are doing. It's important to know what your code does.
 
-GRACE = xr.open_dataset('Path to Grace dataset')
+# Region of interest. None reads the whole globe. Otherwise set region to (west, south, east, north) in degrees, or region_polygon to a list of (lon, lat) vertices, and only that part of GRACE and ETOPO gets read (see Region_Of_Interest.py)
+region = None
+region_polygon = None
+
+GRACE = subset_grace(xr.open_dataset('Path to Grace dataset'), bounds = region, polygon = region_polygon)
 latitude = GRACE.lat.values
 longitude = GRACE.lon.values
 
@@ -28,21 +33,37 @@ downsampled_topography = np.empty((nlatitude, nlongitude), dtype = np.float32)
 ETOPO_path = ("Path to ETOPO dataset")
 
 with rasterio.open(ETOPO_path) as src:
+    # Just the window around the region if there is one
+    if region is None and region_polygon is None:
+        source, source_transform = rasterio.band(src, 1), src.transform
+    else:
+        source, source_transform = read_etopo_window(src, GRACE_transform, (nlatitude, nlongitude))
+
     reproject(
-        source = rasterio.band(src, 1),
+        source = source,
         destination = downsampled_topography,
-        src_transform = src.transform,
+        src_transform = source_transform,
         src_crs = src.crs,
         dst_transform = GRACE_transform,
         dst_crs = "EPSG:4326",
         resampling = Resampling.bilinear
     )
 
+if region_polygon is not None:
+    outside = ~polygon_mask(
+        GRACE_transform.c + GRACE_transform.a * np.arange(nlongitude),
+        GRACE_transform.f + GRACE_transform.e * np.arange(nlatitude),
+        region_polygon,
+    )
+    downsampled_topography[outside] = np.nan
+
 Longitude, Latitude = np.meshgrid(longitude, latitude)
 
 fig, ax = plt.subplots(figsize = (14, 7), subplot_kw = {'projection': ccrs.PlateCarree()})
 ax.set_title("ETOPO (downsampled) with GRACE Affine Grid Overlay")
 
+if region is not None or region_polygon is not None:
+    ax.set_extent([longitude_min, longitude_max, latitude_min, latitude_max], crs = ccrs.PlateCarree())
 ax.coastlines()
 ax.add_feature(cfeature.BORDERS, linewidth = 0.5)
 ax.add_feature(cfeature.LAND, facecolor = 'lightgray')
@@ -5,10 +5,15 @@ import cartopy.feature as cfeature
 import numpy as np
 from matplotlib.widgets import RadioButtons, Slider
 from matplotlib.gridspec import GridSpec
+from Region_Of_Interest import subset_grace
 
 #### This script makes use of the lwe_thickness variable read from the GRACE satellite mission. The topography is from the SRTM (Shuttle Radar Topography Mission) via using the python elevation package (pip install elevation, elevation --help, elevation --output srtm.tif --bounds -180 -90 180 90)
 
-dataset = xr.open_dataset('Path to GRACE dataset')
+# Region of interest. None loads the whole globe. Otherwise set region to (west, south, east, north) in degrees, or region_polygon to a list of (lon, lat) vertices, and only that part of the GRACE cube gets read (see Region_Of_Interest.py)
+region = None
+region_polygon = None
+
+dataset = subset_grace(xr.open_dataset('Path to GRACE dataset'), bounds = region, polygon = region_polygon)
 
 # print(dataset)
 
@@ -70,7 +75,10 @@ def plot_data():
     ax_map.clear()
     ax_cbar.clear()
 
-    ax_map.set_global()
+    if region is None and region_polygon is None:
+        ax_map.set_global()
+    else:
+        ax_map.set_extent([float(lwe.lon.min()), float(lwe.lon.max()), float(lwe.lat.min()), float(lwe.lat.max())], crs = ccrs.PlateCarree())
     ax_map.coastlines()
     ax_map.add_feature(cfeature.BORDERS, linewidth = 0.5)
     ax_map.gridlines(draw_labels = True)